@@ -2,24 +2,38 @@ import json
 from strands import Agent
 from strands.models import BedrockModel
 
-from core.config import MODEL_ID, MODEL_TEMPERATURE
-from core.athena_service import consultar_athena
+from core import aws
+from core.config import MODEL_ID, MODEL_TEMPERATURE, MODEL_CACHE_PROMPT
+from core.athena_service import consultar_athena, consultar_athena_lote
 from core.dynamo_service import consultar_dynamo
 from core.prompt import build_system_prompt
 
 
-def create_agent() -> Agent:
-    """Crea y devuelve el agente configurado con sus herramientas y modelo."""
+def create_agent(callback_handler=None) -> Agent:
+    """Crea y devuelve el agente configurado con sus herramientas y modelo.
+
+    `callback_handler` recibe los eventos del agente mientras responde (por ejemplo,
+    cada fragmento de texto en `data`). Sin él, el agente no escribe nada en consola.
+    """
     prompt = build_system_prompt()
 
+    # Los clientes de AWS se crean aquí, al arrancar, y se reutilizan en todos los turnos:
+    # la primera herramienta que llame el modelo no paga su construcción
+    aws.client("athena")
+    aws.client("dynamodb")
+
     model = BedrockModel(
         model_id=MODEL_ID,
         temperature=MODEL_TEMPERATURE,
         streaming=True,
+        # El prompt de sistema es el mismo en todos los turnos: Bedrock lo guarda en caché
+        # y los turnos siguientes no vuelven a procesarlo completo
+        cache_prompt=MODEL_CACHE_PROMPT,
     )
 
     return Agent(
-        tools=[consultar_dynamo, consultar_athena],
+        tools=[consultar_dynamo, consultar_athena, consultar_athena_lote],
         model=model,
         system_prompt=prompt,
+        callback_handler=callback_handler,
     )
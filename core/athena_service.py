@@ -1,70 +1,118 @@
+import re
 import time
-import hashlib
-from datetime import datetime, timedelta
+import random
+from concurrent.futures import ThreadPoolExecutor
 
-import boto3
 from strands import tool
+from core import aws
+from core.cache import TTLCache
+from core.labels import STATE_LABELS
 from core.config import (
     ATHENA_DB,
     ATHENA_OUTPUT,
     ATHENA_MAX_WAIT,
     ATHENA_MAX_ROWS,
-    AWS_REGION,
+    ATHENA_REUSE_MAX_AGE,
+    ATHENA_MAX_PARALLEL,
 )
 
-# Conexión reutilizable a Athena
-_athena_client = boto3.client("athena", region_name=AWS_REGION)
 
-# Caché en memoria para evitar repetir consultas recientes
-_query_cache: dict[str, tuple[str, datetime]] = {}
+# Conexión reutilizable a Athena (se crea en el primer uso)
+def _get_athena():
+    return aws.client("athena")
+
+
+# Caché en memoria para evitar repetir consultas recientes.
+# Cada entrada guarda también las tablas que lee (para invalidarla por tabla) y cuándo se guardó
+# (para respetar el max_age_minutes de cada llamada).
 _CACHE_TTL_MINUTES = 5
+_CACHE_MAX_ENTRIES = 512
+_query_cache = TTLCache(maxsize=_CACHE_MAX_ENTRIES, ttl=_CACHE_TTL_MINUTES * 60)
+
+# Máximo que acepta Athena en MaxAgeInMinutes (7 días)
+_REUSE_MAX_AGE_LIMIT = 10080
+
+# Tablas que aparecen después de FROM o JOIN (con o sin prefijo de base de datos o comillas)
+_TABLE_RE = re.compile(
+    r'\b(?:from|join)\s+(?:"?[\w-]+"?\.)?"?(\w+)"?',
+    re.IGNORECASE,
+)
 
 
 def _cache_key(sql: str) -> str:
-    return hashlib.md5(sql.strip().lower().encode()).hexdigest()
+    # El texto ya viene normalizado por _normalize_sql (literales intactos) y el dict lo hashea
+    return sql
 
 
-def _get_cached(sql: str) -> str | None:
-    """Devuelve el resultado guardado en caché si todavía es válido."""
-    key = _cache_key(sql)
-    if key in _query_cache:
-        result, ts = _query_cache[key]
-        if datetime.now() - ts < timedelta(minutes=_CACHE_TTL_MINUTES):
-            return result
-        del _query_cache[key]
-    return None
+def _referenced_tables(sql: str) -> frozenset[str]:
+    """Devuelve los nombres de las tablas que lee la consulta."""
+    return frozenset(name.lower() for name in _TABLE_RE.findall(sql))
+
+
+def _get_cached(sql: str, max_age_minutes: int) -> str | None:
+    """Devuelve el resultado guardado en caché si no es más viejo que `max_age_minutes`."""
+    entry = _query_cache.get(_cache_key(sql))
+    if entry is None or time.monotonic() - entry[2] > max_age_minutes * 60:
+        return None
+    return entry[0]
 
 
 def _set_cache(sql: str, result: str):
     """Guarda el resultado de una consulta en caché."""
-    key = _cache_key(sql)
-    _query_cache[key] = (result, datetime.now())
+    _query_cache.set(_cache_key(sql), (result, _referenced_tables(sql), time.monotonic()))
+
+
+def invalidate_tables(*names: str) -> int:
+    """Descarta de la caché las consultas que leen alguna de las tablas indicadas.
+
+    Pensado para llamarse cuando se modifiquen datos de esas tablas.
+    Devuelve cuántas entradas se eliminaron.
+    """
+    changed = {name.lower() for name in names}
+    return _query_cache.discard_if(lambda entry: bool(entry[1] & changed))
 
 
 # Palabras prohibidas por seguridad (evita modificaciones a la base de datos)
-_FORBIDDEN_KEYWORDS = [
-    ";", "insert ", "update ", "delete ",
-    "drop ", "create ", "alter ", "truncate ",
-]
+_FORBIDDEN_RE = re.compile(
+    r";|\b(?:insert|update|delete|drop|create|alter|truncate)\b",
+    re.IGNORECASE,
+)
 
 
 def _validate_query(sql: str) -> str | None:
     """Verifica que la consulta sea segura. Devuelve un mensaje de error si no lo es."""
-    sql_lower = sql.strip().lower()
-
-    if not sql_lower.startswith("select"):
+    if sql.lstrip()[:6].lower() != "select":
         return "❌ Solo se permiten consultas SELECT."
 
-    if any(kw in sql_lower for kw in _FORBIDDEN_KEYWORDS):
+    if _FORBIDDEN_RE.search(sql):
         return "❌ Consulta no permitida por razones de seguridad."
 
     return None
 
 
+# Literales entre comillas simples (se conservan) o bien comentarios y espacios (se compactan)
+_SQL_NOISE_RE = re.compile(r"('(?:[^']|'')*')|(?:\s|--[^\n]*|/\*.*?\*/)+", re.DOTALL)
+_SQL_LITERAL_RE = re.compile(r"('(?:[^']|'')*')")
+
+
+def _normalize_sql(sql: str) -> str:
+    """Quita comentarios, compacta espacios y pasa a minúsculas todo lo que no sea un literal.
+
+    Así dos consultas que solo difieren en formato o en mayúsculas de palabras clave
+    llegan a Athena con el mismo texto y pueden reutilizar el resultado que Athena ya
+    tiene guardado. Los literales no se tocan: '%LG%' y '%lg%' no son la misma búsqueda.
+    """
+    compact = _SQL_NOISE_RE.sub(lambda m: m.group(1) or " ", sql).strip()
+    # Sin comentarios ya no hay comillas sueltas: al partir, los impares son siempre literales
+    parts = _SQL_LITERAL_RE.split(compact)
+    parts[::2] = [part.lower() for part in parts[::2]]
+    return "".join(parts)
+
+
 def _ensure_limit(sql: str) -> str:
     """Agrega un límite de 50 filas si la consulta no tiene uno."""
-    if "limit" not in sql.strip().lower():
-        return sql + " LIMIT 50"
+    if "limit" not in sql.lower():
+        return sql + " limit 50"
     return sql
 
 
@@ -78,17 +126,25 @@ def _parse_results(results: dict) -> str:
 
     lines = [" | ".join(headers)]
     for row in rows:
+        # Solo se traducen las celdas que son exactamente un estado, nunca texto libre
         values = [
-            col.get("VarCharValue", "") for col in row["Data"]
+            STATE_LABELS.get(value, value)
+            for value in (col.get("VarCharValue", "") for col in row["Data"])
         ]
         lines.append(" | ".join(values))
 
-    return "\n".join(lines[: ATHENA_MAX_ROWS + 1])
+    return "\n".join(lines)
+
+# Espera entre revisiones: crece de forma exponencial con un poco de variación aleatoria
+_POLL_FIRST_DELAY = 0.05
+_POLL_BACKOFF = 1.6
+_POLL_MAX_DELAY = 2.0
+_POLL_JITTER = 0.05
+
 
 def _poll_execution(client, execution_id: str) -> dict:
     """Espera a que Athena termine de procesar la consulta, revisando periódicamente."""
-    start = time.time()
-    intervals = [0.15, 0.35, 0.7, 1.0, 1.5, 2.0, 3.0]
+    deadline = time.monotonic() + ATHENA_MAX_WAIT
     idx = 0
 
     while True:
@@ -98,35 +154,36 @@ def _poll_execution(client, execution_id: str) -> dict:
         if status in ("SUCCEEDED", "FAILED", "CANCELLED"):
             return stats
 
-        if time.time() - start > ATHENA_MAX_WAIT:
+        if time.monotonic() > deadline:
             raise TimeoutError("La consulta tardó demasiado tiempo.")
 
-        wait = intervals[min(idx, len(intervals) - 1)]
-        time.sleep(wait)
+        wait = min(_POLL_FIRST_DELAY * _POLL_BACKOFF ** idx, _POLL_MAX_DELAY)
+        time.sleep(wait + random.uniform(0, _POLL_JITTER))
         idx += 1
 
 
-@tool
-def consultar_athena(sql_query: str) -> str:
-    """Ejecuta SQL SELECT en Athena. SOLO para reportes/tops/estadísticas con GROUP BY, SUM, COUNT.
-    Para consultas puntuales usa consultar_dynamo.
-    CAST obligatorio en JOINs con products: CAST(x.product_id AS VARCHAR) = p.product_id.
-    Siempre incluir LIMIT. Ej: "SELECT p.name, SUM(oi.qty) FROM order_items oi JOIN products p ON CAST(oi.product_id AS VARCHAR)=p.product_id GROUP BY p.name ORDER BY 2 DESC LIMIT 5"
-    """
+def _run_query(sql_query: str, max_age_minutes: int) -> str:
+    """Valida, ejecuta y formatea una consulta, usando la caché cuando se puede."""
     # 1. Verificar que la consulta sea segura
+    sql_query = _normalize_sql(sql_query)
     error = _validate_query(sql_query)
     if error:
         return error
 
     sql_query = _ensure_limit(sql_query)
+    try:
+        max_age_minutes = max(0, int(max_age_minutes))
+    except (TypeError, ValueError):
+        return "❌ max_age_minutes debe ser un número entero de minutos."
 
-    # 2. Revisar si ya tenemos el resultado en caché
-    cached = _get_cached(sql_query)
-    if cached is not None:
-        return cached
+    # 2. Revisar si ya tenemos el resultado en caché (salvo que se pidan datos frescos)
+    if max_age_minutes > 0:
+        cached = _get_cached(sql_query, max_age_minutes)
+        if cached is not None:
+            return cached
 
     # 3. Enviar la consulta a Athena
-    client = _athena_client
+    client = _get_athena()
 
     try:
         response = client.start_query_execution(
@@ -135,8 +192,8 @@ def consultar_athena(sql_query: str) -> str:
             ResultConfiguration={"OutputLocation": ATHENA_OUTPUT},
             ResultReuseConfiguration={
                 "ResultReuseByAgeConfiguration": {
-                    "Enabled": True,
-                    "MaxAgeInMinutes": 60
+                    "Enabled": max_age_minutes > 0,
+                    "MaxAgeInMinutes": min(max(max_age_minutes, 1), _REUSE_MAX_AGE_LIMIT),
                 }
             },
         )
@@ -148,7 +205,11 @@ def consultar_athena(sql_query: str) -> str:
 
         # 5. Devolver el resultado
         if status == "SUCCEEDED":
-            results = client.get_query_results(QueryExecutionId=execution_id)
+            # La primera fila es el encabezado; no se piden más filas de las que se muestran
+            results = client.get_query_results(
+                QueryExecutionId=execution_id,
+                MaxResults=ATHENA_MAX_ROWS + 1,
+            )
             parsed = _parse_results(results)
             _set_cache(sql_query, parsed)
             return parsed
@@ -160,3 +221,33 @@ def consultar_athena(sql_query: str) -> str:
         return "⏳ La consulta tardó demasiado tiempo. Intenta refinar la búsqueda."
     except Exception as e:
         return f"Excepción de conexión: {str(e)}"
+
+
+@tool
+def consultar_athena(sql_query: str, max_age_minutes: int = ATHENA_REUSE_MAX_AGE) -> str:
+    """Ejecuta SQL SELECT en Athena. SOLO para reportes/tops/estadísticas con GROUP BY, SUM, COUNT.
+    Para consultas puntuales usa consultar_dynamo.
+    CAST obligatorio en JOINs con products: CAST(x.product_id AS VARCHAR) = p.product_id.
+    Siempre incluir LIMIT. Ej: "SELECT p.name, SUM(oi.qty) FROM order_items oi JOIN products p ON CAST(oi.product_id AS VARCHAR)=p.product_id GROUP BY p.name ORDER BY 2 DESC LIMIT 5"
+    max_age_minutes: antigüedad máxima aceptada del resultado. Usa 0 SOLO si el usuario pide datos actualizados.
+    """
+    return _run_query(sql_query, max_age_minutes)
+
+
+@tool
+def consultar_athena_lote(sql_queries: list[str], max_age_minutes: int = ATHENA_REUSE_MAX_AGE) -> str:
+    """Ejecuta VARIAS consultas SQL SELECT en Athena a la vez. Mismas reglas que consultar_athena.
+    Úsala cuando un mismo pedido necesite 2 o más reportes: tarda lo que la más lenta, no la suma.
+    max_age_minutes: antigüedad máxima aceptada del resultado. Usa 0 SOLO si el usuario pide datos actualizados.
+    """
+    if not sql_queries:
+        return "❌ No se recibió ninguna consulta."
+
+    # Las consultas pasan casi todo el tiempo esperando a Athena, así que se lanzan en paralelo
+    workers = min(len(sql_queries), ATHENA_MAX_PARALLEL)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(lambda q: _run_query(q, max_age_minutes), sql_queries))
+
+    return "\n\n".join(
+        f"CONSULTA {n}:\n{result}" for n, result in enumerate(results, start=1)
+    )
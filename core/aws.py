@@ -0,0 +1,64 @@
+"""
+Conexión compartida con AWS para los servicios del agente.
+
+DynamoDB y Athena salen de la misma sesión de boto3 y comparten la misma
+configuración: un pool de conexiones amplio (para que las consultas en paralelo no
+hagan fila) y conexiones que se mantienen abiertas entre una consulta y otra.
+"""
+
+import threading
+
+import boto3
+from botocore.config import Config
+
+from core.config import AWS_REGION, AWS_MAX_POOL_CONNECTIONS, AWS_MAX_ATTEMPTS
+
+_CONFIG = Config(
+    region_name=AWS_REGION,
+    max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+    retries={"max_attempts": AWS_MAX_ATTEMPTS, "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
+# Crear clientes desde una misma sesión no es seguro entre hilos, por eso el candado
+_lock = threading.Lock()
+_session: boto3.session.Session | None = None
+# Solo clientes de bajo nivel: a diferencia de los recursos, boto3 los garantiza seguros entre hilos
+_clients: dict[str, object] = {}
+
+
+def _get_session() -> boto3.session.Session:
+    global _session
+    if _session is None:
+        _session = boto3.session.Session(region_name=AWS_REGION)
+    return _session
+
+
+def client(service: str):
+    """Devuelve el cliente de bajo nivel del servicio, creándolo solo la primera vez."""
+    if service not in _clients:
+        with _lock:
+            if service not in _clients:
+                _clients[service] = _get_session().client(service, config=_CONFIG)
+    return _clients[service]
+
+
+def dax_client(endpoint_url: str):
+    """Devuelve un cliente de DynamoDB que lee a través del clúster DAX indicado.
+
+    Necesita el paquete opcional `amazon-dax-client`.
+    """
+    if "dax" not in _clients:
+        try:
+            from amazondax import AmazonDaxClient
+        except ImportError as e:
+            raise ImportError(
+                "DAX_ENDPOINT está configurado pero falta el paquete 'amazon-dax-client' "
+                "(pip install amazon-dax-client)."
+            ) from e
+        with _lock:
+            if "dax" not in _clients:
+                _clients["dax"] = AmazonDaxClient(
+                    session=_get_session(), endpoint_url=endpoint_url,
+                )
+    return _clients["dax"]
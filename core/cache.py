@@ -0,0 +1,57 @@
+"""
+Caché en memoria con vencimiento por tiempo y tamaño máximo.
+
+Cuando se llena, descarta la entrada usada hace más tiempo (LRU), así la memoria
+no crece sin límite en sesiones largas. Es segura para usar desde varios hilos.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+class TTLCache:
+    """Guarda hasta `maxsize` valores, cada uno válido durante `ttl` segundos."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Any | None:
+        """Devuelve el valor guardado si todavía es válido, o None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Guarda un valor; si la caché está llena, descarta el menos usado."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard_if(self, predicate: Callable[[Any], bool]) -> int:
+        """Elimina las entradas cuyo valor cumpla la condición. Devuelve cuántas eliminó."""
+        with self._lock:
+            stale = [key for key, (value, _) in self._data.items() if predicate(value)]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,9 +1,10 @@
 import os
-from datetime import datetime
 
 # --- AWS ---
 AWS_PROFILE = "Mario"
 AWS_REGION = "us-east-2"
+AWS_MAX_POOL_CONNECTIONS = 50   # Conexiones simultáneas por cliente (boto3 usa 10 por defecto)
+AWS_MAX_ATTEMPTS = 5            # Reintentos ante errores temporales o límites de AWS
 
 # --- Athena ---
 ATHENA_DB = "dataton-db"
@@ -11,18 +12,22 @@ ATHENA_OUTPUT = "s3://dataton-challenge-unicauca-athena-results/"
 ATHENA_MAX_WAIT = 20        # Máximo de segundos esperando respuesta
 ATHENA_POLL_INTERVAL = 0.5  # Tiempo entre cada revisión del estado
 ATHENA_MAX_ROWS = 20        # Máximo de filas a mostrar en la respuesta
+ATHENA_REUSE_MAX_AGE = 60   # Minutos que Athena puede reutilizar un resultado ya calculado
+ATHENA_MAX_PARALLEL = 5     # Máximo de consultas enviadas a la vez en un lote
 
 # --- DynamoDB ---
 DYNAMO_TABLE = "OmniRetailData"
+DYNAMO_SCAN_SEGMENTS = 4    # Segmentos en paralelo al recorrer toda la tabla
+DYNAMO_ENTITY_INDEX = None  # GSI con "entity" como clave de partición (None = recorrer la tabla)
+DYNAMO_KEEPALIVE_INTERVAL = 60  # Segundos entre pings que mantienen abierta la conexión (0 = sin pings)
+DAX_ENDPOINT = None         # Clúster DAX para las lecturas por clave, ej. "daxs://mi-cluster...:9111" (None = directo)
 
 # --- Modelo ---
 MODEL_ID = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
 MODEL_TEMPERATURE = 0.0
+MODEL_CACHE_PROMPT = "default"  # Punto de caché de Bedrock al final del prompt de sistema (None = sin caché)
 
 # --- Rutas ---
 SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "data_dictionary.json")
 
-# --- Fecha actual del sistema ---
-CURRENT_DATE = datetime.now().strftime("%Y-%m-%d")
-
 os.environ["AWS_PROFILE"] = AWS_PROFILE
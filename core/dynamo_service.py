@@ -6,34 +6,112 @@ pedidos, etc.) con tiempos de respuesta casi instantáneos (~10-50ms),
 en lugar de usar Athena que puede tardar varios segundos.
 """
 
+import functools
+import re
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from typing import NamedTuple
 
-import boto3
-from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.conditions import Attr, ConditionExpressionBuilder, Key
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 from strands import tool
-from core.config import AWS_REGION, ATHENA_MAX_ROWS
+from core import aws
+from core.cache import TTLCache
+from core.labels import STATE_LABELS
+from core.config import (
+    ATHENA_MAX_ROWS,
+    DAX_ENDPOINT,
+    DYNAMO_ENTITY_INDEX,
+    DYNAMO_SCAN_SEGMENTS,
+)
 
 DYNAMO_TABLE = "OmniRetailData"
 
-_dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-_table = _dynamodb.Table(DYNAMO_TABLE)
+
+# Se usa el cliente de bajo nivel y no Table: los recursos de boto3 no son seguros entre hilos,
+# y aquí consultan a la vez los segmentos del recorrido, las búsquedas en paralelo y la precarga
+def _get_client():
+    return aws.client("dynamodb")
+
+
+# Las lecturas por clave (query) pueden ir por DAX; los recorridos completos van siempre directo
+# a DynamoDB, porque DAX guardaría en su caché toda la tabla sin beneficio
+def _get_read_client():
+    if DAX_ENDPOINT:
+        return aws.dax_client(DAX_ENDPOINT)
+    return _get_client()
+
+
+_SERIALIZER = TypeSerializer()
+_DESERIALIZER = TypeDeserializer()
+
+
+def _request(client, method: str, key_condition=None, filter_expression=None, **kwargs) -> dict:
+    """Llama a `method` (query o scan) sobre la tabla con el cliente de bajo nivel.
+
+    Arma las expresiones a partir de Key/Attr y devuelve los registros como dicts de Python,
+    igual que lo haría Table.
+    """
+    builder = ConditionExpressionBuilder()
+    names = dict(kwargs.pop("ExpressionAttributeNames", {}))
+    values = {}
+    for param, condition, is_key in (
+        ("KeyConditionExpression", key_condition, True),
+        ("FilterExpression", filter_expression, False),
+    ):
+        if condition is None:
+            continue
+        built = builder.build_expression(condition, is_key_condition=is_key)
+        kwargs[param] = built.condition_expression
+        names.update(built.attribute_name_placeholders)
+        values.update(
+            (k, _SERIALIZER.serialize(v)) for k, v in built.attribute_value_placeholders.items()
+        )
+    if names:
+        kwargs["ExpressionAttributeNames"] = names
+    if values:
+        kwargs["ExpressionAttributeValues"] = values
+
+    resp = getattr(client, method)(TableName=DYNAMO_TABLE, **kwargs)
+    resp["Items"] = [
+        {k: _DESERIALIZER.deserialize(v) for k, v in item.items()}
+        for item in resp.get("Items", [])
+    ]
+    return resp
 
 
 # ── Funciones auxiliares ───────────────────────────────────────────────
 
+_NORM_TRANS = str.maketrans("áéíóúüñÁÉÍÓÚÜÑ", "aeiouunAEIOUUN")
+
+
 def _normalize(text: str) -> str:
     """Convierte el texto a minúsculas y elimina tildes para facilitar las búsquedas."""
-    trans = str.maketrans("áéíóúüñÁÉÍÓÚÜÑ", "aeiouunAEIOUUN")
-    return text.lower().translate(trans).strip()
+    return text.lower().translate(_NORM_TRANS).strip()
+
+
+# Todo lo que no sea dígito o "+" se ignora al comparar teléfonos
+_DIGITS_RE = re.compile(r"[^\d+]")
 
 
 def _fmt_value(v) -> str:
+    if type(v) is str:
+        return v
     if isinstance(v, Decimal):
         return str(int(v)) if v == v.to_integral_value() else str(v)
     return "" if v is None else str(v)
 
 
+def _to_native_numbers(item: dict):
+    """Reemplaza los Decimal enteros (precios, cantidades...) por int, que se formatean más rápido."""
+    for key, value in item.items():
+        if isinstance(value, Decimal) and value == value.to_integral_value():
+            item[key] = int(value)
+
+
 # Nombres de columnas traducidos a español para que el usuario los entienda
 _COL_LABELS = {
     "customer_id": "id_cliente",
@@ -107,13 +185,9 @@ _COL_LABELS = {
 
 # Valores del sistema traducidos a español para mostrar al usuario
 _VAL_TRANSLATIONS = {
+    **STATE_LABELS,
     "true": "Sí", "false": "No",
-    "active": "Activo", "inactive": "Inactivo", "suspended": "Suspendido",
-    "pending": "Pendiente", "preparing": "En preparación",
-    "shipped": "Enviado", "in_transit": "En tránsito",
-    "out_for_delivery": "En camino", "delivered": "Entregado",
-    "cancelled": "Cancelado", "returned": "Devuelto",
-    "refunded": "Reembolsado", "replaced": "Reemplazado",
+    "inactive": "Inactivo", "suspended": "Suspendido",
     "personal": "Personal", "work": "Trabajo", "other": "Otro",
     "home_delivery": "Domicilio", "store_pickup": "Recoge en tienda",
     "credit_card": "Tarjeta crédito", "debit_card": "Tarjeta débito",
@@ -126,18 +200,29 @@ _VAL_TRANSLATIONS = {
 }
 
 
+# Los valores que se repiten en las tablas son pocos (estados, booleanos), así que se memorizan
+@functools.lru_cache(maxsize=1024)
+def _translate_str(v: str) -> str:
+    return _VAL_TRANSLATIONS.get(v.strip().lower(), v)
+
+
 def _translate_val(v: str) -> str:
-    return _VAL_TRANSLATIONS.get(v.lower().strip(), v) if isinstance(v, str) else v
+    if not isinstance(v, str):
+        return v
+    return _translate_str(v)
 
 
 def _items_to_table(items: list[dict], columns: list[str]) -> str:
     if not items:
         return "Sin resultados (0 filas)."
     headers = [_COL_LABELS.get(c, c) for c in columns]
-    lines = [" | ".join(headers)]
-    for item in items[:ATHENA_MAX_ROWS]:
-        lines.append(" | ".join(_translate_val(_fmt_value(item.get(c, ""))) for c in columns))
-    return "\n".join(lines)
+    # map(item.get, columns) trae todas las celdas de la fila en C; las faltantes llegan como None
+    fmt, translate = _fmt_value, _translate_val
+    rows = [
+        " | ".join([translate(fmt(v)) for v in map(item.get, columns)])
+        for item in items[:ATHENA_MAX_ROWS]
+    ]
+    return "\n".join([" | ".join(headers), *rows])
 
 
 def _query_table(pk_value: str, sk_prefix: str = None, limit: int = 50) -> list[dict]:
@@ -146,11 +231,8 @@ def _query_table(pk_value: str, sk_prefix: str = None, limit: int = 50) -> list[
     if sk_prefix:
         key_condition = key_condition & Key("sk").begins_with(sk_prefix)
 
-    resp = _table.query(
-        KeyConditionExpression=key_condition,
-        Limit=limit,
-    )
-    return resp.get("Items", [])
+    resp = _request(_get_read_client(), "query", key_condition, Limit=limit)
+    return resp["Items"]
 
 
 def _query_gsi1(gsi1pk_value: str, gsi1sk_prefix: str = None, limit: int = 50) -> list[dict]:
@@ -159,36 +241,92 @@ def _query_gsi1(gsi1pk_value: str, gsi1sk_prefix: str = None, limit: int = 50) -
     if gsi1sk_prefix:
         key_condition = key_condition & Key("gsi1sk").begins_with(gsi1sk_prefix)
 
-    resp = _table.query(
-        IndexName="GSI1",
-        KeyConditionExpression=key_condition,
-        Limit=limit,
-    )
-    return resp.get("Items", [])
+    resp = _request(_get_read_client(), "query", key_condition, IndexName="GSI1", Limit=limit)
+    return resp["Items"]
+
+
+# ── Caché en memoria (se carga una sola vez, en la primera búsqueda) ──
+
+_PRODUCT_COLS = [
+    "product_id", "name", "price", "active", "available_qty",
+    "stock_qty", "reserved_qty", "restock_date", "brand_name",
+    "category_name", "warranty_months", "return_days", "free_shipping",
+]
+
+_CUSTOMER_COLS = [
+    "customer_id", "dni", "name", "last_name1", "last_name2",
+    "phone", "account_status", "is_premium",
+]
 
 
-# ── Caché en memoria (se carga una sola vez al iniciar) ───────────────
+def _projection(attrs: list[str]) -> dict:
+    """Arma los parámetros para traer de DynamoDB solo los atributos indicados."""
+    # Se usan alias (#a0, #a1...) porque varios nombres (name, status...) son palabras reservadas
+    names = {f"#a{i}": attr for i, attr in enumerate(attrs)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
 
-def _full_scan(filter_expression=None) -> list[dict]:
-    """Recorre toda la tabla y devuelve los registros que coincidan con el filtro."""
-    kwargs = {}
-    if filter_expression:
-        kwargs["FilterExpression"] = filter_expression
+
+def _scan_segment(segment: int, total_segments: int, filter_expression=None, **extra) -> list[dict]:
+    """Recorre un segmento de la tabla y devuelve los registros que coincidan con el filtro."""
+    kwargs = {"Segment": segment, "TotalSegments": total_segments, **extra}
     items = []
     while True:
-        resp = _table.scan(**kwargs)
-        items.extend(resp.get("Items", []))
+        resp = _request(_get_client(), "scan", filter_expression=filter_expression, **kwargs)
+        items.extend(resp["Items"])
         if "LastEvaluatedKey" not in resp:
             break
         kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
     return items
 
 
+def _full_scan(filter_expression=None, **extra) -> list[dict]:
+    """Recorre toda la tabla en segmentos paralelos y devuelve los registros que coincidan con el filtro."""
+    with ThreadPoolExecutor(max_workers=DYNAMO_SCAN_SEGMENTS) as ex:
+        futures = [
+            ex.submit(_scan_segment, seg, DYNAMO_SCAN_SEGMENTS, filter_expression, **extra)
+            for seg in range(DYNAMO_SCAN_SEGMENTS)
+        ]
+        return [item for f in futures for item in f.result()]
+
+
+def _query_entity(entity: str, **extra) -> list[dict]:
+    """Trae todos los registros de un tipo de entidad usando el índice por entidad."""
+    kwargs = {"IndexName": DYNAMO_ENTITY_INDEX, **extra}
+    items = []
+    while True:
+        resp = _request(_get_client(), "query", Key("entity").eq(entity), **kwargs)
+        items.extend(resp["Items"])
+        if "LastEvaluatedKey" not in resp:
+            break
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    return items
+
+
+def _load_entity(entity: str, attrs: list[str]) -> list[dict]:
+    """Trae todos los registros de una entidad, solo con los atributos indicados."""
+    projection = _projection(attrs)
+    if DYNAMO_ENTITY_INDEX:
+        # Con el índice solo se leen los registros de esa entidad, no toda la tabla
+        return _query_entity(entity, **projection)
+    return _full_scan(Attr("entity").eq(entity), **projection)
+
+
 def _load_caches():
     """Carga todos los productos y clientes en memoria para que las búsquedas sean instantáneas."""
-    products = _full_scan(filter_expression=Attr("entity").eq("product"))
+    product_attrs = [c for c in _PRODUCT_COLS if c != "available_qty"]
+
+    # Las dos lecturas son independientes y pasan casi todo el tiempo esperando la red
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        products_future = ex.submit(_load_entity, "product", product_attrs)
+        customers_future = ex.submit(_load_entity, "customer", _CUSTOMER_COLS)
+        products = products_future.result()
+        customers = customers_future.result()
+
     for p in products:
-        p["name_normalized"] = _normalize(p.get("name", ""))
+        _to_native_numbers(p)
         stock_qty = p.get("stock_qty", 0)
         reserved_qty = p.get("reserved_qty", 0)
         try:
@@ -196,40 +334,115 @@ def _load_caches():
         except (ValueError, TypeError):
             p["available_qty"] = 0
 
-    customers = _full_scan(filter_expression=Attr("entity").eq("customer"))
     for c in customers:
-        full_name = f"{c.get('name', '')} {c.get('last_name1', '')} {c.get('last_name2', '')}".strip()
-        c["name_normalized"] = _normalize(full_name)
+        _to_native_numbers(c)
 
     return products, customers
 
 
-_products_cache, _customers_cache = _load_caches()
+def _customer_full_name(c: dict) -> str:
+    return f"{c.get('name', '')} {c.get('last_name1', '')} {c.get('last_name2', '')}".strip()
+
+
+def _build_trigram_index(names: list[bytes]) -> dict[bytes, set[int]]:
+    """Indexa cada trigrama de los nombres con las posiciones de las filas que lo contienen."""
+    index: dict[bytes, set[int]] = {}
+    for i, name in enumerate(names):
+        for j in range(len(name) - 2):
+            index.setdefault(name[j:j + 3], set()).add(i)
+    return index
+
+
+def _rows_containing(token: bytes, names: list[bytes], index: dict[bytes, set[int]]) -> set[int]:
+    """Devuelve las posiciones de las filas cuyo nombre contiene el token (como subcadena)."""
+    if len(token) < 3:
+        # Tokens muy cortos no tienen trigramas: se revisan todos los nombres
+        return {i for i, name in enumerate(names) if token in name}
+
+    postings = sorted(
+        (index.get(token[j:j + 3], set()) for j in range(len(token) - 2)),
+        key=len,
+    )
+    candidates = set.intersection(*postings)
+    # Los trigramas solo filtran candidatos; se confirma la subcadena completa
+    return {i for i in candidates if token in names[i]}
+
+
+class _Catalog(NamedTuple):
+    """Productos y clientes en memoria, con sus columnas de búsqueda.
+
+    Las columnas son listas paralelas a las filas (la posición i es la fila i),
+    para recorrer cadenas sueltas en vez de buscar la clave en cada diccionario.
+    Los nombres se guardan en bytes UTF-8: buscar subcadenas en bytes es más rápido
+    y da el mismo resultado que en texto.
+    """
+    products: list[dict]
+    product_names: list[bytes]
+    product_index: dict[bytes, set[int]]
+    customers: list[dict]
+    customer_names: list[bytes]
+    customer_index: dict[bytes, set[int]]
+    customer_phones: list[str]
+
+
+_catalog: _Catalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def _get_catalog() -> _Catalog:
+    """Devuelve la caché de productos y clientes, cargándola la primera vez que se necesita."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                products, customers = _load_caches()
+                product_names = [_normalize(p.get("name", "")).encode() for p in products]
+                customer_names = [_normalize(_customer_full_name(c)).encode() for c in customers]
+                _catalog = _Catalog(
+                    products=products,
+                    product_names=product_names,
+                    product_index=_build_trigram_index(product_names),
+                    customers=customers,
+                    customer_names=customer_names,
+                    customer_index=_build_trigram_index(customer_names),
+                    customer_phones=[_DIGITS_RE.sub("", c.get("phone", "")) for c in customers],
+                )
+    return _catalog
 
 
 # ── Operaciones de consulta ────────────────────────────────────────────
 
+def _bucket_items(items: list[dict], entities: tuple[str, ...], header_sk: str = "META") -> dict[str, list[dict]]:
+    """Reparte en una sola pasada los registros de una partición según su tipo.
+
+    El registro principal (sk == header_sk) va en su propio grupo; el resto se agrupa por `entity`.
+    """
+    buckets = {header_sk: [], **{e: [] for e in entities}}
+    for item in items:
+        if item.get("sk") == header_sk:
+            buckets[header_sk].append(item)
+            continue
+        bucket = buckets.get(item.get("entity"))
+        if bucket is not None:
+            bucket.append(item)
+    return buckets
+
+
 def _buscar_producto(nombre: str) -> str:
     """Busca productos por nombre en la caché local."""
-    term = _normalize(nombre)
-    tokens = term.split()
-    items = [
-        p for p in _products_cache
-        if all(t in p.get("name_normalized", "") for t in tokens)
-    ]
-    if not items and len(tokens) > 1:
+    catalog = _get_catalog()
+    tokens = [t.encode() for t in _normalize(nombre).split()]
+    if not tokens:
+        return _items_to_table(catalog.products, _PRODUCT_COLS)
+
+    postings = [_rows_containing(t, catalog.product_names, catalog.product_index) for t in tokens]
+    hits = set.intersection(*postings)
+    if not hits and len(tokens) > 1:
         # Si no encuentra con todas las palabras, busca con al menos una
-        items = [
-            p for p in _products_cache
-            if any(t in p.get("name_normalized", "") for t in tokens)
-        ]
+        hits = set.union(*postings)
 
-    cols = [
-        "product_id", "name", "price", "active", "available_qty",
-        "stock_qty", "reserved_qty", "restock_date", "brand_name",
-        "category_name", "warranty_months", "return_days", "free_shipping",
-    ]
-    return _items_to_table(items, cols)
+    items = [catalog.products[i] for i in sorted(hits)]
+    return _items_to_table(items, _PRODUCT_COLS)
 
 
 def _buscar_cliente_dni(dni: str) -> str:
@@ -239,8 +452,12 @@ def _buscar_cliente_dni(dni: str) -> str:
         return "Sin resultados (0 filas)."
 
     customer_pk = items[0].get("pk", "")
-    profile = _query_table(customer_pk, "PROFILE")
-    emails = _query_table(customer_pk, "EMAIL#")
+    # Perfil y correos son independientes: se piden a la vez
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        profile_future = ex.submit(_query_table, customer_pk, "PROFILE")
+        emails_future = ex.submit(_query_table, customer_pk, "EMAIL#")
+        profile = profile_future.result()
+        emails = emails_future.result()
 
     result_items = profile + emails
 
@@ -253,41 +470,36 @@ def _buscar_cliente_dni(dni: str) -> str:
 
 def _buscar_cliente_phone(phone: str) -> str:
     """Busca un cliente por su número de teléfono en la caché local."""
-    import re
-    digits_only = re.sub(r'[^\d+]', '', phone.strip())
+    digits_only = _DIGITS_RE.sub("", phone.strip())
+    if not digits_only:
+        return _items_to_table([], _CUSTOMER_COLS)
+
+    # Si el texto aparece tal cual en el teléfono, sus dígitos también aparecen en los dígitos
+    catalog = _get_catalog()
     items = [
-        c for c in _customers_cache
-        if digits_only in re.sub(r'[^\d+]', '', c.get('phone', ''))
-        or phone.strip() in c.get('phone', '')
+        catalog.customers[i]
+        for i, digits in enumerate(catalog.customer_phones)
+        if digits_only in digits
     ]
-
-    cols = [
-        "customer_id", "dni", "name", "last_name1", "last_name2",
-        "phone", "account_status", "is_premium",
-    ]
-    return _items_to_table(items, cols)
+    return _items_to_table(items, _CUSTOMER_COLS)
 
 
 def _buscar_cliente_nombre(nombre: str) -> str:
     """Busca un cliente por su nombre en la caché local."""
-    term = _normalize(nombre)
-    tokens = term.split()
-    items = [
-        c for c in _customers_cache
-        if all(t in c.get("name_normalized", "") for t in tokens)
-    ]
-    if not items and len(tokens) > 1:
+    catalog = _get_catalog()
+    tokens = [t.encode() for t in _normalize(nombre).split()]
+    if not tokens:
+        return _items_to_table(catalog.customers, _CUSTOMER_COLS)
+
+    postings = [_rows_containing(t, catalog.customer_names, catalog.customer_index) for t in tokens]
+    hits = set.intersection(*postings)
+    if not hits and len(tokens) > 1:
         # Si no encuentra con el nombre completo, intenta con coincidencia parcial
-        items = [
-            c for c in _customers_cache
-            if sum(1 for t in tokens if t in c.get("name_normalized", "")) >= len(tokens) - 1
-        ]
+        matches = Counter(i for posting in postings for i in posting)
+        hits = {i for i, n in matches.items() if n >= len(tokens) - 1}
 
-    cols = [
-        "customer_id", "dni", "name", "last_name1", "last_name2",
-        "phone", "account_status", "is_premium",
-    ]
-    return _items_to_table(items, cols)
+    items = [catalog.customers[i] for i in sorted(hits)]
+    return _items_to_table(items, _CUSTOMER_COLS)
 
 
 def _pedidos_cliente(customer_id: str) -> str:
@@ -306,10 +518,11 @@ def _detalle_pedido(order_id: str) -> str:
     """Obtiene toda la información de un pedido: resumen, productos, envíos y seguimiento."""
     items = _query_table(f"ORDER#{order_id.strip()}", limit=100)
 
-    meta = [i for i in items if i.get("sk") == "META"]
-    order_items = [i for i in items if i.get("entity") == "order_item"]
-    shipments = [i for i in items if i.get("entity") == "shipment"]
-    tracking = [i for i in items if i.get("entity") == "tracking"]
+    buckets = _bucket_items(items, ("order_item", "shipment", "tracking"))
+    meta = buckets["META"]
+    order_items = buckets["order_item"]
+    shipments = buckets["shipment"]
+    tracking = buckets["tracking"]
 
     parts = []
 
@@ -351,6 +564,30 @@ def _detalle_pedido(order_id: str) -> str:
     return "\n".join(parts)
 
 
+# Tope de pedidos por llamada a DETALLE_PEDIDOS (cada uno es una consulta a su partición)
+_MAX_BATCH_ORDERS = 10
+
+
+def _detalle_pedidos(order_ids: str) -> str:
+    """Obtiene el detalle de varios pedidos a la vez (ids separados por coma)."""
+    # dict.fromkeys quita repetidos conservando el orden en que llegaron
+    ids = list(dict.fromkeys(o.strip() for o in order_ids.split(",") if o.strip()))
+    if not ids:
+        return "❌ No se recibió ningún número de pedido."
+
+    omitted = ids[_MAX_BATCH_ORDERS:]
+    ids = ids[:_MAX_BATCH_ORDERS]
+
+    # Cada pedido vive en su propia partición: las consultas se lanzan en paralelo
+    with ThreadPoolExecutor(max_workers=len(ids)) as ex:
+        details = list(ex.map(_detalle_pedido, ids))
+
+    parts = [f"=== PEDIDO {oid} ===\n{detail}" for oid, detail in zip(ids, details)]
+    if omitted:
+        parts.append(f"(Se omitieron {len(omitted)} pedidos; máximo {_MAX_BATCH_ORDERS} por consulta.)")
+    return "\n\n".join(parts)
+
+
 def _direccion_pedido(order_id: str) -> str:
     """Obtiene la dirección de entrega asociada a un pedido."""
     meta = _query_table(f"ORDER#{order_id.strip()}", "META")
@@ -363,10 +600,12 @@ def _direccion_pedido(order_id: str) -> str:
     if not customer_id or not address_id:
         return "El pedido no tiene dirección de entrega asociada."
 
-    items = _query_table(f"CUSTOMER#{customer_id}", f"ADDR#{address_id}")
+    # Una sola consulta trae todas las direcciones; luego se elige la del pedido
+    addresses = _query_table(f"CUSTOMER#{customer_id}", "ADDR#")
+    items = [a for a in addresses if a.get("sk") == f"ADDR#{address_id}"]
     if not items:
-        # Si no encuentra la dirección exacta, trae todas las del cliente
-        items = _query_table(f"CUSTOMER#{customer_id}", "ADDR#")
+        # Si no encuentra la dirección exacta, muestra todas las del cliente
+        items = addresses
 
     cols = [
         "address_line1", "address_line2", "city", "department",
@@ -410,14 +649,69 @@ def _productos_categoria(category_id: str) -> str:
     return _items_to_table(items, cols)
 
 
+# ── Respuestas directas (sin el modelo) para promociones y categorías ──
+
+def _money(value) -> str:
+    return f"${int(value):,}".replace(",", ".")
+
+
+def _yes_no(value) -> str:
+    return "Sí" if str(value).strip().lower() in ("true", "1") else "No"
+
+
+def describe_promotion(promotion_id: str) -> str:
+    """Describe una promoción en líneas "etiqueta: valor" para mostrarla tal cual al usuario."""
+    items = _query_table(f"PROMO#{promotion_id.strip()}", "PROFILE")
+    if not items:
+        return f"No encontré la promoción {promotion_id}."
+    promo = items[0]
+
+    value = promo.get("discount_value")
+    if value is None:
+        discount = "—"
+    elif "percent" in str(promo.get("discount_type", "")).lower():
+        discount = f"{_fmt_value(value)}%"
+    else:
+        discount = _money(value)
+
+    lines = [f"Promoción {promotion_id}: {promo.get('promotion_name', '')}", f"Descuento: {discount}"]
+    if promo.get("min_purchase_amount"):
+        lines.append(f"Compra mínima: {_money(promo['min_purchase_amount'])}")
+    lines.append(f"Vigencia: {promo.get('start_date', '—')} a {promo.get('end_date', '—')}")
+    lines.append(f"Activa: {_yes_no(promo.get('active'))}")
+    lines.append(f"Solo clientes premium: {_yes_no(promo.get('requires_premium'))}")
+    return "\n".join(lines)
+
+
+def describe_category(category_id: str) -> str:
+    """Lista los productos de una categoría, uno por línea, para mostrarla tal cual al usuario."""
+    items = _query_gsi1(f"CAT#{category_id.strip()}", limit=30)
+    if not items:
+        return f"No hay productos en la categoría {category_id}."
+
+    lines = [f"Productos de la categoría {category_id}:"]
+    for item in items[:ATHENA_MAX_ROWS]:
+        line = f"- {item.get('name', '')}"
+        if item.get("brand_name"):
+            line += f" ({item['brand_name']})"
+        if item.get("price") is not None:
+            line += f": {_money(item['price'])}"
+        line += f", {_fmt_value(item.get('available_qty')) or 0} disponibles"
+        if _yes_no(item.get("active", True)) == "No":
+            line += " (inactivo)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
 def _perfil_completo_cliente(customer_id: str) -> str:
     """Obtiene toda la información del cliente: datos personales, correos, direcciones y tarjetas."""
     items = _query_table(f"CUSTOMER#{customer_id.strip()}", limit=50)
 
-    profile = [i for i in items if i.get("sk") == "PROFILE"]
-    emails = [i for i in items if i.get("entity") == "email"]
-    addresses = [i for i in items if i.get("entity") == "address"]
-    cards = [i for i in items if i.get("entity") == "card"]
+    buckets = _bucket_items(items, ("email", "address", "card"), header_sk="PROFILE")
+    profile = buckets["PROFILE"]
+    emails = buckets["email"]
+    addresses = buckets["address"]
+    cards = buckets["card"]
 
     parts = []
 
@@ -460,6 +754,7 @@ _OPERATIONS = {
     "CLIENTE_NOMBRE":    _buscar_cliente_nombre,
     "PEDIDOS":           _pedidos_cliente,
     "DETALLE_PEDIDO":    _detalle_pedido,
+    "DETALLE_PEDIDOS":   _detalle_pedidos,
     "DIRECCION_PEDIDO":  _direccion_pedido,
     "PERFIL_CLIENTE":    _perfil_completo_cliente,
     "TICKETS":           _buscar_tickets,
@@ -468,14 +763,35 @@ _OPERATIONS = {
 }
 
 
+# ── Precarga y mantenimiento de la conexión ──────────────────────────
+
+def warm_up():
+    """Carga el catálogo en memoria para que la primera búsqueda no tenga que esperarlo."""
+    _get_catalog()
+
+
+def ping():
+    """Consulta barata (DescribeTable) que evita que se cierre la conexión por inactividad."""
+    _get_client().describe_table(TableName=DYNAMO_TABLE)
+
+
 # ── Herramienta principal que usa el agente ──────────────────────────
 
+# Respuestas recientes de operaciones de lectura que cambian poco (perfiles, promociones, categorías).
+# PEDIDOS y TICKETS no entran: el cliente espera ver su estado al día.
+# PRODUCTO tampoco: ya se responde desde el catálogo en memoria.
+_CACHEABLE_OPS = {"PERFIL_CLIENTE", "CLIENTE_DNI", "PROMOCION", "PRODUCTOS_CAT"}
+_CACHE_TTL_SECONDS = 60
+_CACHE_MAX_ENTRIES = 2048
+_result_cache = TTLCache(maxsize=_CACHE_MAX_ENTRIES, ttl=_CACHE_TTL_SECONDS)
+
+
 @tool
 def consultar_dynamo(operacion: str) -> str:
     """Consulta rápida a DynamoDB. Formato: OPERACION:valor.
     Ops: PRODUCTO:<nombre>, CLIENTE_DNI:<dni>, CLIENTE_PHONE:<tel>, CLIENTE_NOMBRE:<nombre>,
-    PERFIL_CLIENTE:<cid>, PEDIDOS:<cid>, DETALLE_PEDIDO:<oid>, DIRECCION_PEDIDO:<oid>,
-    TICKETS:<cid>, PROMOCION:<pid>, PRODUCTOS_CAT:<catid>.
+    PERFIL_CLIENTE:<cid>, PEDIDOS:<cid>, DETALLE_PEDIDO:<oid>, DETALLE_PEDIDOS:<oid1,oid2,...>,
+    DIRECCION_PEDIDO:<oid>, TICKETS:<cid>, PROMOCION:<pid>, PRODUCTOS_CAT:<catid>.
     Ej: "PRODUCTO:monitor lg" o "CLIENTE_DNI:12345"
     """
     start = time.time()
@@ -494,8 +810,16 @@ def consultar_dynamo(operacion: str) -> str:
     if not handler:
         return f"❌ Operación desconocida: '{op_name}'. Disponibles: {', '.join(_OPERATIONS.keys())}"
 
+    cache_key = f"{op_name}:{value}" if op_name in _CACHEABLE_OPS else None
+    if cache_key:
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            return f"{cached}\n\n[DynamoDB: caché]"
+
     try:
         result = handler(value)
+        if cache_key:
+            _result_cache.set(cache_key, result)
         elapsed_ms = (time.time() - start) * 1000
         return f"{result}\n\n[DynamoDB: {elapsed_ms:.0f}ms]"
     except Exception as e:
@@ -0,0 +1,12 @@
+"""
+Nombres en español de los estados internos que devuelven DynamoDB y Athena.
+
+Las herramientas los traducen al armar su salida; el código en inglés solo se usa en el SQL.
+"""
+
+STATE_LABELS = {
+    "pending": "Pendiente", "preparing": "En preparación", "shipped": "Enviado",
+    "in_transit": "En tránsito", "out_for_delivery": "En camino de entrega",
+    "delivered": "Entregado", "cancelled": "Cancelado", "returned": "Devuelto",
+    "active": "Activo", "refunded": "Reembolsado", "replaced": "Reemplazado",
+}
@@ -1,28 +1,238 @@
-import sys
-import io
+import re
+import threading
 import time
+import unicodedata
 
-from core.config import ATHENA_DB
+from core import dynamo_service
+from core.config import ATHENA_DB, DYNAMO_KEEPALIVE_INTERVAL
 from core.agent import create_agent
+from core.cache import TTLCache
+from core.prompt import temporal_context
 from ui import console as ui
 
 _EXIT_CMDS = {"salir", "exit", "quit"}
 _CLEAR_CMDS = {"limpiar", "clear", "cls"}
 _HELP_CMDS = {"ayuda", "help"}
 
+# Respuestas recientes a consultas públicas (catálogo, stock, reportes), por texto normalizado.
+# Después del primer mensaje solo se usa con preguntas que se entienden solas (ver _stands_alone).
+_RESPONSE_CACHE = TTLCache(maxsize=128, ttl=300)
+
+# Consultas que no se guardan: hablan de datos personales (dependen de quién esté identificado)
+# o se apoyan en lo dicho antes en la conversación. Van sin tildes: se comparan ya normalizadas.
+_UNCACHEABLE_WORDS = {
+    "mi", "mis", "me", "mio", "mia", "soy", "cuenta", "perfil",
+    "pedido", "pedidos", "orden", "ordenes", "ticket", "tickets",
+    "tarjeta", "tarjetas", "direccion", "cedula", "celular",
+    "telefono", "devolucion", "garantia",
+    "ese", "esa", "eso", "esos", "esas", "este", "esta", "esto", "estos", "estas",
+    "anterior", "primero", "segundo", "tercero", "otro", "otra",
+}
+
+# Números que parecen documentos o celulares (pueden venir con espacios, puntos, guiones o +57)
+_NUMBER_RE = re.compile(r"\+?\d[\d\s.-]{5,}\d")
+_PHONE_RE = re.compile(r"^3\d{9}$")   # Celular colombiano: 10 dígitos que empiezan por 3
+_DNI_RE = re.compile(r"^\d{7,10}$")
+
+_PHONE_WORDS = {"celular", "cel", "telefono", "movil", "whatsapp"}
+_DNI_WORDS = {"cedula", "documento", "cc", "identificacion"}
+# Si el número acompaña a estas palabras no es una identificación (pedido, precio...)
+_NOT_ID_WORDS = {
+    "pedido", "pedidos", "orden", "ordenes", "ticket", "tickets", "promo", "promocion",
+    "promociones", "categoria", "categorias", "producto", "productos", "precio", "precios",
+    "cuesta", "cuestan", "vale", "valen", "pesos", "valor", "guia", "guias",
+}
+# Fechas (2024-01-01, 15/03/2024, 20240101) y montos con separador de miles (2.000.000):
+# sin una palabra de identificación al lado, no son una cédula ni un celular
+_DATE_OR_AMOUNT_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}[-/]\d{1,2}[-/]\d{4}"
+    r"|\b20\d{2}(?:0[1-9]|1[0-2])(?:0[1-9]|[12]\d|3[01])\b"
+    r"|\d{1,3}(?:[.,]\d{3})+"
+)
+
+# Palabras de relleno que no cambian lo que se pregunta ("¿Qué productos hay agotados?",
+# "dime los productos agotados" y "productos agotados" comparten respuesta).
+# Se quitan antes de _stands_alone, así "¿cuál es el estado?" queda en "estado" y no se reutiliza
+# a mitad de conversación. "cuantos"/"cuantas" no van: piden un conteo, no una lista.
+_FILLER_WORDS = {
+    "que", "cual", "cuales", "hay", "son", "es", "estan",
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "de", "del", "al", "a",
+    "en", "por", "para", "favor", "dime", "muestrame", "quiero", "saber", "puedes",
+    "podrias", "ver", "lista", "listar", "todos", "todas", "actualmente", "ahora",
+}
+
+# Ya iniciada la conversación, una pregunta que empieza así continúa la anterior ("¿y el precio?")
+_FOLLOW_UP_STARTS = {"y", "e", "o", "pero", "entonces", "tambien", "ademas", "mas"}
+# Palabras que preguntan por un dato sin nombrar de qué producto o pedido se habla:
+# "¿cuántas unidades quedan?" o "¿cuál es el estado?" dependen de lo dicho antes
+_ATTRIBUTE_WORDS = {
+    "precio", "precios", "cuesta", "cuestan", "vale", "valen", "valor", "estado", "estados",
+    "unidades", "queda", "quedan", "stock", "disponible", "disponibles", "disponibilidad",
+    "specs", "especificaciones", "caracteristicas", "color", "colores", "marca", "envio",
+    "descuento", "tiene", "tienen", "cuanto", "cuanta", "cuantos", "cuantas", "como",
+    "donde", "cuando",
+}
+
+# Mensajes que equivalen a una sola operación pública de DynamoDB: se responden sin el modelo.
+# Pedidos, perfiles y tickets no van aquí: dependen de CLIENTE_SESION y los valida el agente.
+_FAST_PATHS = [
+    (re.compile(r"^promo(?:cion)?\s*#?(\d+)$"), dynamo_service.describe_promotion),
+    (re.compile(r"^categoria\s*#?(\d+)$"), dynamo_service.describe_category),
+]
+
+
+def _on_agent_event(**event):
+    """Muestra en consola el texto de la respuesta a medida que el modelo lo genera."""
+    if "data" in event:
+        ui.stream_chunk(event["data"])
+
+
+def _identification_route(query: str) -> str | None:
+    """Si el mensaje trae una cédula o un celular, devuelve la ruta de DynamoDB para buscarlo.
+
+    Una palabra como "cédula" o "celular", el prefijo +57 o la forma de celular (3XXXXXXXXX)
+    identifican aunque el mensaje hable también de pedidos. Sin ellas, un número solo se toma
+    como cédula si es todo el mensaje; así los números de los reportes ("más de 1000000 ventas")
+    no cuentan.
+    """
+    numbers = _NUMBER_RE.findall(query)
+    if len(numbers) != 1 or "$" in query:
+        return None
+    words = set(re.findall(r"\w+", _strip_accents(query.lower())))
+
+    raw = numbers[0]
+    digits = re.sub(r"\D", "", raw)
+    has_prefix = raw.startswith("+57")
+    if has_prefix:
+        digits = digits[2:]
+
+    if words & _DNI_WORDS:
+        op = "CLIENTE_DNI"
+    elif has_prefix or words & _PHONE_WORDS or _PHONE_RE.match(digits):
+        op = "CLIENTE_PHONE"
+    elif words & _NOT_ID_WORDS or _DATE_OR_AMOUNT_RE.search(query):
+        return None
+    # El mensaje no tiene nada más que el número (y quizá signos)
+    elif not re.search(r"\w", query.replace(raw, "")) and _DNI_RE.match(digits):
+        op = "CLIENTE_DNI"
+    else:
+        return None
+    return f'consultar_dynamo("{op}:{digits}")'
+
 
 def _invoke_agent(agent, query: str):
-    """Ejecuta el agente sin mostrar los mensajes intermedios en consola."""
-    old_stdout = sys.stdout
-    sys.stdout = io.StringIO()
+    """Ejecuta el agente; su respuesta se va mostrando mientras se genera."""
+    # Clasificar el número aquí le ahorra al modelo decidir si es cédula o celular
+    route = _identification_route(query)
+    if route:
+        query = f"[RUTA: {route}]\n{query}"
+    return agent(f"{temporal_context()}\n{query}")
+
+
+def _fast_path(query: str):
+    """Devuelve (plantilla, id) si el mensaje es una consulta pública directa."""
+    text = _strip_accents(query.strip(" ¿?¡!.").lower())
+    for pattern, describe in _FAST_PATHS:
+        match = pattern.match(text)
+        if match:
+            return describe, match.group(1)
+    return None
+
+
+def _run_fast_path(agent, query: str, fast_path) -> str | None:
+    """Responde con la plantilla y deja el turno en el historial; None si DynamoDB falla."""
+    describe, value = fast_path
     try:
-        return agent(query)
-    finally:
-        sys.stdout = old_stdout
+        result = describe(value)
+    except Exception:
+        return None
+    _record_cached_turn(agent, query, result)
+    return result
+
+
+def _background_warm_up():
+    """Mientras el usuario escribe: abre la conexión, carga el catálogo y la mantiene viva."""
+    # Los errores se ignoran: si AWS falla, la consulta real lo mostrará en pantalla
+    for step in (dynamo_service.ping, dynamo_service.warm_up):
+        try:
+            step()
+        except Exception:
+            pass
+
+    while DYNAMO_KEEPALIVE_INTERVAL > 0:
+        time.sleep(DYNAMO_KEEPALIVE_INTERVAL)
+        try:
+            dynamo_service.ping()
+        except Exception:
+            pass
+
+
+def _record_cached_turn(agent, query: str, result: str):
+    """Agrega al historial del agente un turno respondido sin el modelo (caché o ruta directa).
+
+    Sin esto, la siguiente pregunta ("¿y cuánto cuesta?") llegaría al modelo sin contexto.
+    """
+    agent.messages.append({"role": "user", "content": [{"text": f"{temporal_context()}\n{query}"}]})
+    agent.messages.append({"role": "assistant", "content": [{"text": result}]})
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _stands_alone(words: list[str]) -> bool:
+    """Indica si la pregunta (ya sin palabras de relleno) se entiende sin los turnos anteriores."""
+    if not words or words[0] in _FOLLOW_UP_STARTS:
+        return False
+    # Debe nombrar algo además del dato que pide ("productos agotados" sí, "precio" no)
+    return bool(set(words) - _ATTRIBUTE_WORDS)
+
+
+def _response_cache_key(query: str, history: list) -> str | None:
+    """Devuelve la clave de caché de la consulta, o None si su respuesta no debe reutilizarse.
+
+    La clave ignora mayúsculas, tildes, signos y palabras de relleno, así que variantes
+    de la misma pregunta comparten respuesta. El orden de las palabras se conserva
+    ("de mayor a menor" no es lo mismo que "de menor a mayor"). Con turnos anteriores en
+    `history`, solo se usa para preguntas que no dependen de ellos.
+    """
+    # Los números suelen ser cédulas, celulares o pedidos: datos de un cliente concreto
+    if any(ch.isdigit() for ch in query):
+        return None
+    words = re.findall(r"\w+", _strip_accents(query.lower()))
+    if _UNCACHEABLE_WORDS.intersection(words):
+        return None
+    words = [w for w in words if w not in _FILLER_WORDS]
+    if history and not _stands_alone(words):
+        return None
+    return " ".join(words) or None
+
+
+def _answer(agent, query: str) -> str:
+    """Responde un mensaje por la ruta directa, la caché de respuestas o el agente."""
+    fast_path = _fast_path(query)
+    result = _run_fast_path(agent, query, fast_path) if fast_path else None
+    if result is not None:
+        return result
+
+    cache_key = _response_cache_key(query, agent.messages)
+    result = _RESPONSE_CACHE.get(cache_key) if cache_key else None
+    if result is not None:
+        _record_cached_turn(agent, query, result)
+        return result
+
+    ui.stream_begin()
+    result = str(_invoke_agent(agent, query))
+    if cache_key:
+        _RESPONSE_CACHE.set(cache_key, result)
+    return result
 
 
 def main():
-    agent = create_agent()
+    agent = create_agent(callback_handler=_on_agent_event)
+    threading.Thread(target=_background_warm_up, daemon=True).start()
 
     ui.clear()
     ui.banner(ATHENA_DB)
@@ -56,13 +266,15 @@ def main():
                 continue
 
             ui.loading()
-            start = time.time()
-            result = _invoke_agent(agent, user_input)
-            elapsed = time.time() - start
+            start = time.perf_counter()
+            result = _answer(agent, user_input)
+            elapsed = time.perf_counter() - start
 
-            ui.done(elapsed)
             query_count += 1
-            ui.response(result, elapsed)
+            # Si la respuesta ya se mostró mientras llegaba, solo falta cerrar el recuadro
+            if not ui.stream_end(elapsed):
+                ui.done(elapsed)
+                ui.response(result, elapsed)
 
         except KeyboardInterrupt:
             ui.goodbye(query_count)
@@ -0,0 +1,81 @@
+import pytest
+
+from core import athena_service
+from core.athena_service import _parse_results
+
+
+def _results(headers, *rows):
+    return {
+        "ResultSet": {
+            "ResultSetMetadata": {"ColumnInfo": [{"Label": h} for h in headers]},
+            "Rows": [
+                {"Data": [{"VarCharValue": h} for h in headers]},
+                *({"Data": [{"VarCharValue": v} for v in row]} for row in rows),
+            ],
+        }
+    }
+
+
+def test_state_cells_are_translated():
+    text = _parse_results(_results(["order_id", "status"], ["12", "out_for_delivery"], ["13", "delivered"]))
+    assert text.splitlines()[1:] == ["12 | En camino de entrega", "13 | Entregado"]
+
+
+def test_free_text_is_left_alone():
+    text = _parse_results(_results(["name"], ["Audífonos active noise cancelling"], ["active"]))
+    assert text.splitlines()[1:] == ["Audífonos active noise cancelling", "Activo"]
+
+
+class _FakeAthena:
+    def __init__(self):
+        self.started = []
+
+    def start_query_execution(self, **kwargs):
+        self.started.append(kwargs)
+        return {"QueryExecutionId": str(len(self.started))}
+
+    def get_query_execution(self, QueryExecutionId):
+        return {"QueryExecution": {"Status": {"State": "SUCCEEDED"}}}
+
+    def get_query_results(self, QueryExecutionId, MaxResults):
+        return _results(["n"], [QueryExecutionId])
+
+
+@pytest.fixture
+def athena(monkeypatch):
+    client = _FakeAthena()
+    clock = [1000.0]
+    monkeypatch.setattr(athena_service, "_get_athena", lambda: client)
+    monkeypatch.setattr(athena_service.time, "monotonic", lambda: clock[0])
+    athena_service._query_cache.clear()
+    yield client, clock
+    athena_service._query_cache.clear()
+
+
+def test_cached_result_respects_max_age(athena):
+    client, clock = athena
+    sql = "SELECT COUNT(*) AS n FROM orders"
+    athena_service._run_query(sql, 60)
+    clock[0] += 120  # dos minutos después: sigue en la caché (5 min) pero es más viejo que 1 min
+    athena_service._run_query(sql, 5)
+    athena_service._run_query(sql, 1)
+    assert len(client.started) == 2
+
+
+def test_reuse_age_is_capped_at_the_athena_limit(athena):
+    client, _ = athena
+    athena_service._run_query("SELECT 1 AS n FROM orders", 50000)
+    reuse = client.started[0]["ResultReuseConfiguration"]["ResultReuseByAgeConfiguration"]
+    assert reuse == {"Enabled": True, "MaxAgeInMinutes": 10080}
+
+
+def test_invalid_max_age_returns_an_error_message(athena):
+    client, _ = athena
+    assert athena_service._run_query("SELECT 1 AS n FROM orders", "mucho").startswith("❌")
+    assert client.started == []
+
+
+def test_prompt_lists_every_state_code_for_sql():
+    from core.labels import STATE_LABELS
+    from core.prompt import _ATHENA_SCHEMA
+    assert [code for code in STATE_LABELS if code not in _ATHENA_SCHEMA] == []
@@ -0,0 +1,120 @@
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Attr
+
+from core import dynamo_service
+
+
+class _FakeDynamo:
+    """Cliente de bajo nivel falso: guarda las llamadas y responde en formato tipado de DynamoDB."""
+
+    def __init__(self, pages):
+        self.calls = []
+        self._pages = list(pages)
+
+    def _respond(self, method, kwargs):
+        self.calls.append((method, kwargs))
+        return self._pages.pop(0)
+
+    def query(self, **kwargs):
+        return self._respond("query", kwargs)
+
+    def scan(self, **kwargs):
+        return self._respond("scan", kwargs)
+
+
+def test_query_table_builds_key_expression_and_returns_python_items(monkeypatch):
+    client = _FakeDynamo([{"Items": [{"pk": {"S": "ORDER#7"}, "sk": {"S": "META"}, "total_amount": {"N": "1500"}}]}])
+    monkeypatch.setattr(dynamo_service, "_get_read_client", lambda: client)
+
+    items = dynamo_service._query_table("ORDER#7", "ME", limit=5)
+
+    assert items == [{"pk": "ORDER#7", "sk": "META", "total_amount": Decimal("1500")}]
+    method, kwargs = client.calls[0]
+    assert method == "query"
+    assert kwargs["TableName"] == dynamo_service.DYNAMO_TABLE
+    assert kwargs["Limit"] == 5
+    assert kwargs["KeyConditionExpression"] == "(#n0 = :v0 AND begins_with(#n1, :v1))"
+    assert kwargs["ExpressionAttributeNames"] == {"#n0": "pk", "#n1": "sk"}
+    assert kwargs["ExpressionAttributeValues"] == {":v0": {"S": "ORDER#7"}, ":v1": {"S": "ME"}}
+
+
+def test_scan_segment_keeps_projection_aliases_and_follows_pages(monkeypatch):
+    client = _FakeDynamo([
+        {"Items": [{"name": {"S": "Monitor"}}], "LastEvaluatedKey": {"pk": {"S": "PRODUCT#1"}}},
+        {"Items": [{"name": {"S": "Teclado"}}]},
+    ])
+    monkeypatch.setattr(dynamo_service, "_get_client", lambda: client)
+
+    items = dynamo_service._scan_segment(
+        0, 4, Attr("entity").eq("product"), **dynamo_service._projection(["name"]),
+    )
+
+    assert items == [{"name": "Monitor"}, {"name": "Teclado"}]
+    first, second = (kwargs for _, kwargs in client.calls)
+    assert first["ProjectionExpression"] == "#a0"
+    assert first["ExpressionAttributeNames"] == {"#a0": "name", "#n0": "entity"}
+    assert first["FilterExpression"] == "#n0 = :v0"
+    assert "ExclusiveStartKey" not in first
+    assert second["ExclusiveStartKey"] == {"pk": {"S": "PRODUCT#1"}}
+
+
+def test_detalle_pedidos_queries_each_order_through_the_shared_client(monkeypatch):
+    class _OrdersDynamo:
+        def __init__(self):
+            self.pks = []
+
+        def query(self, **kwargs):
+            pk = kwargs["ExpressionAttributeValues"][":v0"]["S"]
+            self.pks.append(pk)
+            return {"Items": [{
+                "pk": {"S": pk}, "sk": {"S": "META"}, "entity": {"S": "order"},
+                "order_id": {"S": pk.removeprefix("ORDER#")}, "status": {"S": "delivered"},
+            }]}
+
+    client = _OrdersDynamo()
+    monkeypatch.setattr(dynamo_service, "_get_read_client", lambda: client)
+
+    text = dynamo_service._detalle_pedidos("7, 8, 7, 9")
+
+    assert sorted(client.pks) == ["ORDER#7", "ORDER#8", "ORDER#9"]
+    blocks = text.split("\n\n")
+    assert [b.splitlines()[0] for b in blocks] == ["=== PEDIDO 7 ===", "=== PEDIDO 8 ===", "=== PEDIDO 9 ==="]
+    assert all("Entregado" in b for b in blocks)
+
+
+def test_promotion_is_described_without_raw_field_names(monkeypatch):
+    monkeypatch.setattr(dynamo_service, "_query_table", lambda *a, **k: [{
+        "promotion_name": "Semana tech", "discount_type": "percentage", "discount_value": Decimal("15"),
+        "min_purchase_amount": Decimal("200000"), "start_date": "2024-11-01", "end_date": "2024-11-30",
+        "active": True, "requires_premium": False,
+    }])
+
+    assert dynamo_service.describe_promotion("12").splitlines() == [
+        "Promoción 12: Semana tech",
+        "Descuento: 15%",
+        "Compra mínima: $200.000",
+        "Vigencia: 2024-11-01 a 2024-11-30",
+        "Activa: Sí",
+        "Solo clientes premium: No",
+    ]
+
+
+def test_category_lists_products_with_formatted_prices(monkeypatch):
+    monkeypatch.setattr(dynamo_service, "_query_gsi1", lambda *a, **k: [
+        {"name": "Monitor 27", "brand_name": "LG", "price": Decimal("1299900"), "available_qty": Decimal("4"), "active": True},
+        {"name": "Teclado", "price": Decimal("89000"), "available_qty": Decimal("0"), "active": False},
+    ])
+
+    assert dynamo_service.describe_category("3").splitlines() == [
+        "Productos de la categoría 3:",
+        "- Monitor 27 (LG): $1.299.900, 4 disponibles",
+        "- Teclado: $89.000, 0 disponibles (inactivo)",
+    ]
+
+
+def test_empty_fast_path_results_are_a_sentence(monkeypatch):
+    monkeypatch.setattr(dynamo_service, "_query_table", lambda *a, **k: [])
+    monkeypatch.setattr(dynamo_service, "_query_gsi1", lambda *a, **k: [])
+    assert dynamo_service.describe_promotion("99") == "No encontré la promoción 99."
+    assert dynamo_service.describe_category("99") == "No hay productos en la categoría 99."
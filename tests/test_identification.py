@@ -0,0 +1,35 @@
+import pytest
+
+from main import _identification_route
+
+
+@pytest.mark.parametrize("query", [
+    "ventas desde 2024-01-01",
+    "clientes registrados el 15-03-2024",
+    "pedidos creados el 15/03/2024",
+    "ventas entre 20240101 y hoy",
+    "productos con más de 1000000 ventas",
+    "productos que cuestan menos de 2.000.000",
+    "clientes con más de 1500000 en compras",
+    "top 10 clientes de 2024",
+])
+def test_report_questions_get_no_route(query):
+    assert _identification_route(query) is None
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("1061234567", "CLIENTE_DNI:1061234567"),
+    ("12345678.", "CLIENTE_DNI:12345678"),
+    ("mi cédula es 1.061.234.567", "CLIENTE_DNI:1061234567"),
+    ("cc 20240101", "CLIENTE_DNI:20240101"),
+    ("3001234567", "CLIENTE_PHONE:3001234567"),
+    ("mi número es 300 123 4567", "CLIENTE_PHONE:3001234567"),
+    ("+57 300 123 4567", "CLIENTE_PHONE:3001234567"),
+    ("celular 6012345678", "CLIENTE_PHONE:6012345678"),
+    ("mi celular es 3001234567, ¿dónde está mi pedido?", "CLIENTE_PHONE:3001234567"),
+    ("soy Sandra, cédula 1061234567, quiero ver mis pedidos", "CLIENTE_DNI:1061234567"),
+    ("3001234567 estado de mi pedido", "CLIENTE_PHONE:3001234567"),
+])
+def test_identification_numbers_get_a_route(query, expected):
+    assert _identification_route(query) == f'consultar_dynamo("{expected}")'
+
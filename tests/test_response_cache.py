@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from main import _record_cached_turn, _response_cache_key
+
+_PREVIOUS_TURN = [
+    {"role": "user", "content": [{"text": "¿Tienen el monitor LG 27?"}]},
+    {"role": "assistant", "content": [{"text": "Sí, quedan 4 unidades a $899.000."}]},
+]
+
+
+def test_first_public_question_is_cacheable():
+    assert _response_cache_key("¿Qué productos están agotados?", []) is not None
+
+
+def test_follow_up_does_not_hit_the_cache():
+    for follow_up in ("¿y cuánto cuesta?", "¿cuál es el estado?", "¿y el precio?", "¿cuántas unidades quedan?"):
+        assert _response_cache_key(follow_up, _PREVIOUS_TURN) is None
+
+
+class _FakeAgent:
+    """Agente falso: cuenta las llamadas y guarda cada turno en su historial, como el real."""
+
+    def __init__(self):
+        self.messages = []
+        self.calls = 0
+
+    def __call__(self, prompt):
+        self.calls += 1
+        answer = f"respuesta {self.calls}"
+        self.messages.append({"role": "user", "content": [{"text": prompt}]})
+        self.messages.append({"role": "assistant", "content": [{"text": answer}]})
+        return answer
+
+
+@pytest.fixture
+def session():
+    main._RESPONSE_CACHE.clear()
+    yield _FakeAgent()
+    main._RESPONSE_CACHE.clear()
+
+
+def test_repeated_question_hits_the_cache_within_a_session(session):
+    answers = [main._answer(session, "¿Qué productos están agotados?") for _ in range(4)]
+    assert session.calls == 1
+    assert answers == ["respuesta 1"] * 4
+    assert len(session.messages) == 8
+
+
+def test_follow_up_after_a_cached_answer_reaches_the_agent(session):
+    main._answer(session, "¿Qué productos están agotados?")
+    main._answer(session, "¿y cuánto cuesta?")
+    main._answer(session, "¿Qué productos están agotados?")
+    main._answer(session, "¿y cuánto cuesta?")
+    assert session.calls == 3
+
+
+def test_same_question_later_in_a_conversation_is_cacheable():
+    query = "¿Qué productos están agotados?"
+    assert _response_cache_key(query, _PREVIOUS_TURN) == _response_cache_key(query, [])
+
+
+def test_personal_questions_are_never_cached():
+    assert _response_cache_key("¿dónde está mi pedido?", []) is None
+    assert _response_cache_key("mi cédula es 1061234567", []) is None
+
+
+def test_cached_answer_is_added_to_the_history():
+    agent = SimpleNamespace(messages=[])
+    _record_cached_turn(agent, "productos agotados", "Ninguno.")
+    assert [m["role"] for m in agent.messages] == ["user", "assistant"]
+    assert agent.messages[0]["content"][0]["text"].endswith("\nproductos agotados")
+    assert agent.messages[1]["content"][0]["text"] == "Ninguno."
+    # Con ese turno en el historial, la siguiente pregunta ya no usa la caché
+    assert _response_cache_key("¿y cuánto cuesta?", agent.messages) is None
+
+
+def test_filler_words_merge_paraphrases_but_not_follow_ups():
+    assert _response_cache_key("¿Cuáles son los productos agotados?", []) == _response_cache_key("productos agotados", [])
+    assert _response_cache_key("¿cuál es el estado?", _PREVIOUS_TURN) is None
+    assert _response_cache_key("estado", _PREVIOUS_TURN) is None
+
+
+def test_paraphrase_hits_the_cache_in_a_later_turn(session):
+    main._answer(session, "¿Cuáles son los productos agotados?")
+    main._answer(session, "¿y cuánto cuesta?")
+    assert main._answer(session, "dime los productos agotados por favor") == "respuesta 1"
+    assert session.calls == 2
+
+
+def test_count_question_in_a_later_turn_reaches_the_agent(session):
+    main._answer(session, "productos agotados")
+    main._answer(session, "¿cuántos productos agotados hay?")
+    assert session.calls == 2
+
+
+def test_count_and_list_questions_do_not_share_a_key():
+    assert _response_cache_key("¿cuántos productos agotados hay?", []) != _response_cache_key("productos agotados", [])
+
+
+def test_fast_path_answers_without_the_agent_and_keeps_the_turn(session, monkeypatch):
+    monkeypatch.setattr(main.dynamo_service, "_query_table", lambda *a, **k: [])
+    assert main._answer(session, "¿Promoción 7?") == "No encontré la promoción 7."
+    assert session.calls == 0
+    assert [m["role"] for m in session.messages] == ["user", "assistant"]
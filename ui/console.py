@@ -3,9 +3,18 @@ Interfaz visual de la consola para el asistente OmniRetail.
 """
 
 import os
+import sys
 import textwrap
 from datetime import datetime
 
+# prompt_toolkit es opcional: permite que otros hilos escriban mientras se espera la entrada
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.formatted_text import ANSI
+    from prompt_toolkit.patch_stdout import patch_stdout
+except ImportError:
+    PromptSession = None
+
 # --- Colores para la consola ---
 _C = '\033[96m'   # Cyan
 _G = '\033[92m'   # Green
@@ -16,50 +25,76 @@ _D = '\033[2m'    # Dim
 _W = '\033[97m'   # White
 _0 = '\033[0m'    # Reset
 
+# En Windows, un os.system vacío activa la interpretación de secuencias ANSI en la consola
+if os.name == 'nt':
+    os.system('')
+
 
 def clear():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    # Borra la pantalla y lleva el cursor al inicio sin lanzar un proceso 'cls'/'clear'
+    sys.stdout.write('\033[2J\033[H')
+    sys.stdout.flush()
 
 
-def banner(db_name: str):
-    now = datetime.now().strftime('%d/%m/%Y %H:%M')
-    print(f"""
+# Las partes fijas de la pantalla se arman una sola vez; solo la base de datos y la hora varían
+_BANNER_TEMPLATE = f"""
 {_C}{_B}╔══════════════════════════════════════════════════════════════╗
 ║                                                              ║
 ║         ◆◆◆   O M N I R E T A I L   ◆◆◆                     ║
 ║         Asistente Inteligente de Datos Retail                 ║
 ║                                                              ║
 ╠══════════════════════════════════════════════════════════════╣
-║  {_D}{_W}Motor: Claude 3.5 Sonnet  │  DB: {db_name:<20}{_C}  ║
-║  {_D}{_W}Sesión: {now}     │  Estado: {_G}● Conectado{_C}           ║
+║  {_D}{_W}Motor: Claude 3.5 Sonnet  │  DB: {{db:<20}}{_C}  ║
+║  {_D}{_W}Sesión: {{now}}     │  Estado: {_G}● Conectado{_C}           ║
 ╚══════════════════════════════════════════════════════════════╝{_0}
-""")
+"""
+
+_HELP_SECTIONS = {
+    "📦 Inventario":  "Stock · Agotados · Niveles",
+    "🛒 Pedidos":     "Órdenes · Historial · Envíos",
+    "👥 Clientes":    "Búsqueda · Soporte · Contacto",
+    "💰 Promociones": "Descuentos · Cupones · Campañas",
+    "📊 Productos":   "Catálogo · Specs · Precios",
+}
+_HELP_EXAMPLES = ["¿Cuáles son las specs del iPhone 14?", "¿Qué productos están agotados?", "Top 5 productos más vendidos"]
+
+_HELP_TEXT = "\n".join([
+    f"  {_D}Áreas de consulta:{_0}",
+    *(f"    {_B}{cat}{_0}  {_D}{desc}{_0}" for cat, desc in _HELP_SECTIONS.items()),
+    *(f"    {_C}›{_0} {ex}" for ex in _HELP_EXAMPLES),
+    "",
+])
+
+_FOOTER_TEXT = f"  {_D}'salir' terminar  │  'limpiar' pantalla  │  'ayuda' opciones{_0}"
+
+
+def banner(db_name: str):
+    now = datetime.now().strftime('%d/%m/%Y %H:%M')
+    print(_BANNER_TEMPLATE.format(db=db_name, now=now))
 
 
 def help_panel():
-    sections = {
-        "📦 Inventario":  "Stock · Agotados · Niveles",
-        "🛒 Pedidos":     "Órdenes · Historial · Envíos",
-        "👥 Clientes":    "Búsqueda · Soporte · Contacto",
-        "💰 Promociones": "Descuentos · Cupones · Campañas",
-        "📊 Productos":   "Catálogo · Specs · Precios",
-    }
-    print(f"  {_D}Áreas de consulta:{_0}")
-    for cat, desc in sections.items():
-        print(f"    {_B}{cat}{_0}  {_D}{desc}{_0}")
-
-    for ex in ["¿Cuáles son las specs del iPhone 14?", "¿Qué productos están agotados?", "Top 5 productos más vendidos"]:
-        print(f"    {_C}›{_0} {ex}")
-    print()
+    print(_HELP_TEXT)
 
 
 def footer():
-    print(f"  {_D}'salir' terminar  │  'limpiar' pantalla  │  'ayuda' opciones{_0}")
+    print(_FOOTER_TEXT)
+
+
+_session = None
 
 
 def prompt() -> str:
+    global _session
     ts = datetime.now().strftime('%H:%M:%S')
-    return input(f"\n  {_Y}{_B}[{ts}] ❯{_0} ")
+    text = f"\n  {_Y}{_B}[{ts}] ❯{_0} "
+    if PromptSession is None or not sys.stdin.isatty():
+        return input(text)
+
+    if _session is None:
+        _session = PromptSession()
+    with patch_stdout():
+        return _session.prompt(ANSI(text))
 
 
 def loading():
@@ -70,9 +105,15 @@ def done(elapsed: float):
     print(f"\r  {_D}✓ Completado en {elapsed:.1f}s{_0}      ")
 
 
+# Un solo TextWrapper para todas las respuestas (textwrap.fill crea uno nuevo en cada línea)
+_WRAPPER = textwrap.TextWrapper(
+    width=58, subsequent_indent='    ', break_long_words=False, break_on_hyphens=False,
+)
+
+
 def response(text, elapsed: float = 0):
     lines = str(text).strip().split('\n')
-    wrapped = '\n'.join(textwrap.fill(l, width=58, subsequent_indent='    ') for l in lines)
+    wrapped = '\n'.join(_WRAPPER.fill(l) for l in lines)
     body = wrapped.replace('\n', f'\n  {_G}│{_0}  ')
     tag = f"  {_D}({elapsed:.1f}s){_0}" if elapsed else ""
     print(f"""
@@ -83,7 +124,81 @@ def response(text, elapsed: float = 0):
   {_G}╰{'─' * 58}{_0}""")
 
 
+# ── Respuesta por partes (streaming) ─────────────────────────────────
+
+_WRAP_WIDTH = 58
+_WRAP_INDENT = "    "
+
+_stream = {"open": False, "col": 0, "word": "", "space": False}
+
+
+def stream_begin():
+    """Prepara la salida para una respuesta que llegará por partes."""
+    _stream.update(open=False, col=0, word="", space=False)
+
+
+def _stream_open():
+    # Reemplaza la línea de "Procesando..." por el encabezado de la respuesta
+    sys.stdout.write(f"\r\033[K\n  {_G}{_B}╭─── OmniRetail IA ───{_0}\n  {_G}│{_0}\n  {_G}│{_0}  ")
+    _stream["open"] = True
+
+
+def _stream_word():
+    """Escribe la palabra acumulada, pasando a la línea siguiente si no cabe."""
+    word = _stream["word"]
+    if not word:
+        return
+    col = _stream["col"]
+    if col and col + 1 + len(word) > _WRAP_WIDTH:
+        sys.stdout.write(f"\n  {_G}│{_0}  {_WRAP_INDENT}{word}")
+        col = len(_WRAP_INDENT) + len(word)
+    elif col and _stream["space"]:
+        sys.stdout.write(f" {word}")
+        col += 1 + len(word)
+    else:
+        sys.stdout.write(word)
+        col += len(word)
+    _stream.update(col=col, word="", space=False)
+
+
+def stream_chunk(text: str):
+    """Muestra un fragmento de la respuesta apenas llega, línea por línea dentro del recuadro."""
+    if not _stream["open"]:
+        text = text.lstrip()
+        if not text:
+            return
+        _stream_open()
+
+    # Las palabras se escriben completas para poder cortar las líneas sin partirlas
+    for ch in text:
+        if ch == "\n":
+            _stream_word()
+            sys.stdout.write(f"\n  {_G}│{_0}  ")
+            _stream.update(col=0, space=False)
+        elif ch.isspace():
+            _stream_word()
+            _stream["space"] = True
+        else:
+            _stream["word"] += ch
+    sys.stdout.flush()
+
+
+def stream_end(elapsed: float = 0) -> bool:
+    """Cierra el recuadro de la respuesta. Devuelve False si no llegó ningún fragmento."""
+    if not _stream["open"]:
+        return False
+    _stream_word()
+    tag = f" {_D}({elapsed:.1f}s){_0}" if elapsed else ""
+    print(f"""
+  {_G}│{_0}
+  {_G}╰{'─' * 58}{_0}{tag}""")
+    _stream["open"] = False
+    return True
+
+
 def error(text):
+    if _stream["open"]:
+        stream_end()
     print(f"""
   {_R}{_B}╭─── Error ───{_0}
   {_R}│{_0}  {text}